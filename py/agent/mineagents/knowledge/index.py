@@ -2,15 +2,53 @@ from __future__ import annotations
 
 import math
 import re
-from collections import Counter
+import sys
+from collections import Counter, OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-WORD_RE = re.compile(r"[a-z0-9]+", re.IGNORECASE)
+import numpy as np
+from scipy import sparse
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Above this many stored weights, scoring only the query terms' posting columns beats a full
+# CSR mat-vec; below it the column slicing overhead dominates. The CSC copy those columns come
+# from doubles index memory, so it is only built on the first single-query search.
+POSTINGS_MIN_NNZ = 100_000
+# Number of recent queries whose term weights are kept per index.
+QUERY_CACHE_SIZE = 1024
 
 
 def _tokenize(text: str) -> List[str]:
-    return [token.lower() for token in WORD_RE.findall(text)]
+    return WORD_RE.findall(text.lower())
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if top_k < len(scores):
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        kth_score = scores[candidates].min()
+        at_cutoff = scores[candidates] == kth_score
+        tied_mask = scores == kth_score
+        if np.count_nonzero(tied_mask) > np.count_nonzero(at_cutoff):
+            # argpartition picks arbitrary members of a tie at the cut-off; take the earliest
+            # inserted instead, as a stable full sort would. Ties are usually the zero scores of
+            # non-matching entries, so scan a growing prefix rather than the whole mask.
+            above = candidates[~at_cutoff]
+            needed = top_k - len(above)
+            stop = 4 * top_k
+            while True:
+                tied = np.flatnonzero(tied_mask[:stop])
+                if len(tied) >= needed or stop >= len(scores):
+                    break
+                stop *= 4
+            candidates = np.concatenate([above, tied[:needed]])
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
 
 
 @dataclass
@@ -20,6 +58,9 @@ class KnowledgeEntry:
     source: str
     metadata: Dict[str, str] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        self.key = sys.intern(self.key)
+
 
 @dataclass
 class SearchResult:
@@ -30,76 +71,281 @@ class SearchResult:
 class HowToIndex:
     def __init__(self, entries: Optional[Iterable[KnowledgeEntry]] = None) -> None:
         self.entries: List[KnowledgeEntry] = list(entries or [])
-        self._doc_freq: Counter[str] = Counter()
-        self._embeddings: List[Dict[str, float]] = []
-        self._norms: List[float] = []
+        self._doc_freq: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._doc_lens: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._counts: sparse.csr_matrix = sparse.csr_matrix((0, 0))
+        self._vocab: Dict[str, int] = {}
+        self._idf: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._oov_idf: float = 0.0
+        self._matrix: sparse.csr_matrix = sparse.csr_matrix((0, 0))
+        self._use_postings: bool = False
+        self._postings: Optional[sparse.csc_matrix] = None
         self._built: bool = False
+        self._stale: bool = False
+        self._query_cache: OrderedDict[str, Tuple[np.ndarray, np.ndarray, float]] = OrderedDict()
+        # Rows appended since the last refresh: CSR-style column/count runs plus token totals.
+        self._pending_cols: List[int] = []
+        self._pending_counts: List[int] = []
+        self._pending_offsets: List[int] = [0]
+        self._pending_lens: List[int] = []
 
     def add_entry(self, entry: KnowledgeEntry) -> None:
         self.entries.append(entry)
         self._built = False
 
-    def build(self) -> None:
-        if not self.entries:
-            self._doc_freq.clear()
-            self._embeddings.clear()
-            self._norms.clear()
-            self._built = True
+    def append(self, entry: KnowledgeEntry) -> None:
+        """Add an entry to a built index without re-tokenizing the existing corpus.
+
+        The new row is buffered and only merged into the count matrix on the next search, so a
+        run of appends costs one matrix rebuild instead of one copy per entry.
+        """
+
+        if not self._built:
+            self.add_entry(entry)
             return
 
-        self._doc_freq = Counter()
+        tokens = _tokenize(entry.text)
+        tf = Counter(self._vocab.setdefault(token, len(self._vocab)) for token in tokens)
+        self._pending_cols.extend(tf.keys())
+        self._pending_counts.extend(tf.values())
+        self._pending_offsets.append(len(self._pending_cols))
+        self._pending_lens.append(len(tokens))
+        self.entries.append(entry)
+        self._stale = True
+
+    def _clear_pending(self) -> None:
+        self._pending_cols.clear()
+        self._pending_counts.clear()
+        del self._pending_offsets[1:]
+        self._pending_lens.clear()
+
+    def _merge_pending(self) -> None:
+        if not self._pending_lens:
+            return
+
+        vocab_size = len(self._vocab)
+        cols = np.asarray(self._pending_cols, dtype=np.int32)
+        pending = sparse.csr_matrix(
+            (
+                np.asarray(self._pending_counts, dtype=np.float32),
+                cols,
+                np.asarray(self._pending_offsets, dtype=np.int32),
+            ),
+            shape=(len(self._pending_lens), vocab_size),
+        )
+        # Widen by re-wrapping the existing arrays; they may be read-only memory maps.
+        counts = self._counts
+        widened = sparse.csr_matrix(
+            (counts.data, counts.indices, counts.indptr), shape=(counts.shape[0], vocab_size)
+        )
+        self._counts = sparse.vstack([widened, pending], format="csr")
+        # Columns are unique within each pending row, so counting them gives document frequency.
+        self._doc_freq = np.pad(self._doc_freq, (0, vocab_size - len(self._doc_freq)))
+        self._doc_freq += np.bincount(cols, minlength=vocab_size)
+        self._doc_lens = np.concatenate(
+            [self._doc_lens, np.asarray(self._pending_lens, dtype=np.int64)]
+        )
+        self._clear_pending()
+
+    def build(self) -> None:
+        self._clear_pending()
+        self._vocab = {}
+        token_ids: List[int] = []
+        offsets: List[int] = [0]
         for entry in self.entries:
-            tokens = set(_tokenize(entry.text))
-            self._doc_freq.update(tokens)
+            token_ids.extend(
+                self._vocab.setdefault(token, len(self._vocab)) for token in _tokenize(entry.text)
+            )
+            offsets.append(len(token_ids))
 
         num_docs = len(self.entries)
-        self._embeddings = []
-        self._norms = []
+        vocab_size = len(self._vocab)
+        self._doc_lens = np.diff(np.asarray(offsets, dtype=np.int64))
+        rows = np.repeat(np.arange(num_docs, dtype=np.int32), self._doc_lens)
+        cols = np.asarray(token_ids, dtype=np.int32)
 
-        for entry in self.entries:
-            tokens = _tokenize(entry.text)
-            tf = Counter(tokens)
-            doc_len = len(tokens)
-            embedding: Dict[str, float] = {}
-            for token, count in tf.items():
-                idf = math.log((1 + num_docs) / (1 + self._doc_freq[token]))
-                embedding[token] = (count / doc_len) * idf
-            norm = math.sqrt(sum(weight * weight for weight in embedding.values()))
-            self._embeddings.append(embedding)
-            self._norms.append(norm if norm != 0 else 1.0)
+        # Duplicate (row, col) pairs are summed on conversion, giving raw term counts per document.
+        self._counts = sparse.coo_matrix(
+            (np.ones(len(cols), dtype=np.float32), (rows, cols)),
+            shape=(num_docs, vocab_size),
+        ).tocsr()
+        self._counts.sum_duplicates()
+        self._doc_freq = np.bincount(self._counts.indices, minlength=vocab_size)
 
+        self._refresh_weights()
         self._built = True
 
-    def _vectorize_query(self, text: str) -> Dict[str, float]:
+    def _refresh_weights(self) -> None:
+        self._merge_pending()
+        num_docs = self._counts.shape[0]
+        self._idf = np.log((1 + num_docs) / (1 + self._doc_freq)).astype(np.float32)
+        self._oov_idf = math.log(1 + num_docs)
+
+        matrix = self._counts.copy()
+        nnz_rows = np.repeat(np.arange(num_docs), np.diff(matrix.indptr))
+        matrix.data *= self._idf[matrix.indices] / self._doc_lens[nnz_rows]
+        norms = np.sqrt(np.bincount(nnz_rows, weights=matrix.data**2, minlength=num_docs))
+        norms[norms == 0] = 1.0
+        matrix.data /= norms[nnz_rows]
+
+        self._set_matrix(matrix)
+        self._query_cache.clear()
+        self._stale = False
+
+    def _set_matrix(self, matrix: sparse.csr_matrix) -> None:
+        self._matrix = matrix
+        self._use_postings = matrix.nnz >= POSTINGS_MIN_NNZ
+        self._postings = None
+
+    def save(self, directory: Path) -> None:
+        """Write the built index as one .npy file per array under ``directory``."""
+
+        self._ensure_ready()
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "vocab": np.asarray(list(self._vocab), dtype=np.str_),
+            "doc_freq": self._doc_freq,
+            "doc_lens": self._doc_lens,
+            "idf": self._idf,
+            "counts_data": self._counts.data,
+            "counts_indices": self._counts.indices,
+            "counts_indptr": self._counts.indptr,
+            "matrix_data": self._matrix.data,
+            "matrix_indices": self._matrix.indices,
+            "matrix_indptr": self._matrix.indptr,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", array)
+
+    @classmethod
+    def load(cls, directory: Path, entries: Iterable[KnowledgeEntry]) -> "HowToIndex":
+        """Restore an index written by ``save`` for the same entries, without re-tokenizing.
+
+        Arrays are memory-mapped read-only, so pages are only read in as scoring touches them.
+        Nothing mutates them in place: ``append`` and ``_refresh_weights`` build new arrays.
+        """
+
+        index = cls(entries)
+        arrays = {path.stem: np.load(path, mmap_mode="r") for path in directory.glob("*.npy")}
+        if len(arrays["doc_lens"]) != len(index.entries):
+            raise ValueError(f"Saved index in {directory} does not match the given entries")
+
+        index._vocab = {token: idx for idx, token in enumerate(arrays["vocab"].tolist())}
+        shape = (len(index.entries), len(index._vocab))
+        index._doc_freq = arrays["doc_freq"]
+        index._doc_lens = arrays["doc_lens"]
+        index._idf = arrays["idf"]
+        index._oov_idf = math.log(1 + len(index.entries))
+        index._counts = sparse.csr_matrix(
+            (arrays["counts_data"], arrays["counts_indices"], arrays["counts_indptr"]), shape=shape
+        )
+        index._set_matrix(
+            sparse.csr_matrix(
+                (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]),
+                shape=shape,
+            )
+        )
+        index._built = True
+        return index
+
+    def _vectorize_query(self, text: str) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Return the query's known term ids, their weights, and the norm including OOV terms."""
+
         tokens = _tokenize(text)
-        tf = Counter(tokens)
-        num_docs = len(self.entries) or 1
-        vector: Dict[str, float] = {}
-        for token, count in tf.items():
-            idf = math.log((1 + num_docs) / (1 + self._doc_freq.get(token, 0)))
-            vector[token] = (count / len(tokens)) * idf
-        return vector
+        if not tokens:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), 0.0
+
+        ids = np.fromiter(
+            (self._vocab.get(token, -1) for token in tokens), dtype=np.int32, count=len(tokens)
+        )
+        known = ids >= 0
+        term_ids, counts = np.unique(ids[known], return_counts=True)
+        weights = counts.astype(np.float32) * self._idf[term_ids]
+        weights /= len(tokens)
+
+        norm = float(np.linalg.norm(weights))
+        if not known.all():
+            oov_counts = Counter(token for token, is_known in zip(tokens, known) if not is_known)
+            oov_weight = self._oov_idf / len(tokens)
+            norm = math.hypot(norm, *(count * oov_weight for count in oov_counts.values()))
+
+        return term_ids, weights, norm
+
+    def _query_terms(self, text: str) -> Tuple[np.ndarray, np.ndarray, float]:
+        # Only the sparse ids/weights are cached, so an entry costs bytes per query term rather
+        # than a vocabulary-length vector. Entries are only valid for the current weights;
+        # _refresh_weights clears them.
+        cached = self._query_cache.get(text)
+        if cached is not None:
+            self._query_cache.move_to_end(text)
+            return cached
+
+        term_ids, weights, norm = self._vectorize_query(text)
+        term_ids.setflags(write=False)
+        weights.setflags(write=False)
+        self._query_cache[text] = (term_ids, weights, norm)
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return term_ids, weights, norm
+
+    def _ensure_ready(self) -> None:
+        if not self._built:
+            self.build()
+        elif self._stale:
+            self._refresh_weights()
+
+    def _dot_scores(self, term_ids: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        if not self._use_postings:
+            query_vec = np.zeros(self._matrix.shape[1], dtype=np.float32)
+            query_vec[term_ids] = weights
+            return self._matrix @ query_vec
+        if self._postings is None:
+            # Deferred from _set_matrix so batch-only callers never pay for the copy, and an
+            # index loaded from a memory-mapped artifact is not read into RAM at load time.
+            self._postings = self._matrix.tocsc()
+        return self._postings[:, term_ids] @ weights
+
+    def _top_results(self, dots: np.ndarray, query_norm: float, top_k: int) -> List[SearchResult]:
+        # Rows are unit length, so ranking by raw dot products matches cosine order;
+        # only the k survivors are divided by the query norm.
+        return [
+            SearchResult(entry=self.entries[idx], score=float(dots[idx]) / query_norm)
+            for idx in _top_k_indices(dots, top_k)
+        ]
 
     def search(self, query: str, top_k: int = 3) -> List[SearchResult]:
         if not query.strip():
             return []
 
-        if not self._built:
-            self.build()
+        self._ensure_ready()
 
         if not self.entries:
             return []
 
-        query_vec = self._vectorize_query(query)
-        query_norm = math.sqrt(sum(weight * weight for weight in query_vec.values())) or 1.0
+        term_ids, weights, query_norm = self._query_terms(query)
+        return self._top_results(self._dot_scores(term_ids, weights), query_norm or 1.0, top_k)
+
+    def search_batch(self, queries: Sequence[str], top_k: int = 3) -> List[List[SearchResult]]:
+        """Search several queries at once, scoring them all with a single sparse-dense product."""
+
+        results: List[List[SearchResult]] = [[] for _ in queries]
+        active = [idx for idx, query in enumerate(queries) if query.strip()]
+        if not active:
+            return results
+
+        self._ensure_ready()
+
+        if not self.entries:
+            return results
 
-        scores: List[SearchResult] = []
-        for entry, embedding, norm in zip(self.entries, self._embeddings, self._norms):
-            dot = 0.0
-            for token, q_weight in query_vec.items():
-                dot += q_weight * embedding.get(token, 0.0)
-            score = dot / (query_norm * norm) if norm else 0.0
-            scores.append(SearchResult(entry=entry, score=score))
+        query_matrix = np.zeros((len(active), len(self._vocab)), dtype=np.float32)
+        query_norms: List[float] = []
+        for row, idx in enumerate(active):
+            term_ids, weights, norm = self._query_terms(queries[idx])
+            query_matrix[row, term_ids] = weights
+            query_norms.append(norm or 1.0)
 
-        scores.sort(key=lambda result: result.score, reverse=True)
-        return scores[:top_k]
\ No newline at end of file
+        dots = self._matrix @ query_matrix.T
+        for col, (idx, norm) in enumerate(zip(active, query_norms)):
+            results[idx] = self._top_results(dots[:, col], norm, top_k)
+        return results
\ No newline at end of file
@@ -1,23 +1,47 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import pickle
+import shutil
+import sys
+from contextlib import suppress
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 
 from .index import HowToIndex, KnowledgeEntry, SearchResult
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; fall back to the stdlib parser.
+    orjson = None
+
 
 class RecipeValidationError(ValueError):
     pass
 
 
+MAX_DETAILS_PREVIEW = 180
+
+
 @dataclass
 class RecipeStep:
     title: str
     action: str
     details: str
     checks: List[str] = field(default_factory=list)
+    details_truncated: str = field(init=False, repr=False, compare=False)
+    checks_preview: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if len(self.details) > MAX_DETAILS_PREVIEW:
+            self.details_truncated = f"{self.details[:MAX_DETAILS_PREVIEW - 3]}..."
+        else:
+            self.details_truncated = self.details
+        self.checks_preview = ", ".join(self.checks[:2])
 
 
 @dataclass
@@ -31,8 +55,21 @@ class Recipe:
     environment: List[str] = field(default_factory=list)
     hazards: List[str] = field(default_factory=list)
     notes: str = ""
+    _cached_entry: Optional[KnowledgeEntry] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The entry is derived; unpickling it would skip KnowledgeEntry.__post_init__ and leave
+        # its key un-interned, so as_entry() rebuilds it after a load instead.
+        state = self.__dict__.copy()
+        state["_cached_entry"] = None
+        return state
 
     def as_entry(self) -> KnowledgeEntry:
+        if self._cached_entry is not None:
+            return self._cached_entry
+
         text_chunks = [
             self.name,
             self.goal,
@@ -48,12 +85,13 @@ class Recipe:
             text_chunks.extend([step.title, step.action, step.details, " ".join(step.checks)])
 
         text = "\n".join(chunk for chunk in text_chunks if chunk)
-        return KnowledgeEntry(
+        self._cached_entry = KnowledgeEntry(
             key=self.name,
             text=text,
             source="recipe",
             metadata={"goal": self.goal, "tags": ",".join(self.tags)},
         )
+        return self._cached_entry
 
 
 def _require_field(data: Dict, field_name: str, parent: str, path: Path) -> None:
@@ -127,7 +165,7 @@ def _parse_recipe(data: Dict, path: Path) -> Recipe:
         raise RecipeValidationError(f"Invalid recipe {path}: notes must be a string if provided")
 
     return Recipe(
-        name=name.strip(),
+        name=sys.intern(name.strip()),
         goal=goal.strip(),
         steps=steps,
         tags=tags,
@@ -139,52 +177,183 @@ def _parse_recipe(data: Dict, path: Path) -> Recipe:
     )
 
 
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def load_recipe_file(path: Path) -> Recipe:
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
+        data = _loads(path.read_bytes())
     except json.JSONDecodeError as exc:
         raise RecipeValidationError(f"Invalid recipe {path}: JSON decode error at line {exc.lineno}, column {exc.colno}: {exc.msg}") from exc
 
     return _parse_recipe(data, path)
 
 
-def load_recipes_from_dir(directory: Path) -> List[Recipe]:
+@lru_cache(maxsize=1)
+def _source_fingerprint() -> str:
+    """Digest of the mineagents source, so cached recipes and indexes expire with the code.
+
+    Unpickling skips ``__post_init__`` and saved indexes hold the old tokenizer's output, so any
+    code change must invalidate them; hashing the source avoids relying on a manual version bump.
+    """
+
+    package_root = Path(__file__).resolve().parent.parent
+    digest = hashlib.blake2b(digest_size=16)
+    for source in sorted(package_root.rglob("*.py")):
+        digest.update(source.relative_to(package_root).as_posix().encode("utf-8"))
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def _recipe_cache_path(path: Path, cache_dir: Path) -> Path:
+    stat = path.stat()
+    key = f"{_source_fingerprint()}:{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return cache_dir / f"{digest}.pkl"
+
+
+def _cached_load_recipe_file(path: Path, cache_dir: Path, cache_path: Path) -> Recipe:
+    try:
+        with cache_path.open("rb") as handle:
+            recipe = pickle.load(handle)
+    except Exception:  # Missing, corrupt or incompatible cache entries are all misses.
+        pass
+    else:
+        if isinstance(recipe, Recipe):
+            recipe.name = sys.intern(recipe.name)
+            return recipe
+
+    recipe = load_recipe_file(path)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("wb") as handle:
+            pickle.dump(recipe, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:  # An unwritable cache only loses reuse; the parsed recipe is still valid.
+        with suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+    return recipe
+
+
+def _prune_cache_entries(cache_dir: Path, pattern: str, keep: Set[str]) -> None:
+    """Delete cache entries matching ``pattern`` except ``keep``; in-flight .tmp entries stay."""
+
+    for stale in cache_dir.glob(pattern):
+        if stale.name in keep or stale.suffix == ".tmp":
+            continue
+        if stale.is_dir():
+            shutil.rmtree(stale, ignore_errors=True)
+        else:
+            with suppress(OSError):
+                stale.unlink()
+
+
+def load_recipes_from_dir(directory: Path, cache_dir: Optional[Path] = None) -> List[Recipe]:
+    """Load recipes, reusing parsed copies pickled in ``cache_dir`` for unchanged files.
+
+    ``cache_dir`` is owned by this directory: pickles that no longer match one of its files
+    (edited, removed, or written by older code) are deleted after loading.
+    """
+
     if not directory.exists():
         raise FileNotFoundError(f"Recipe directory does not exist: {directory}")
 
-    recipes: List[Recipe] = []
-    for path in sorted(directory.glob("*.json")):
-        recipes.append(load_recipe_file(path))
+    paths = sorted(directory.glob("*.json"))
+    if cache_dir is None:
+        return [load_recipe_file(path) for path in paths]
+
+    cache_paths = [_recipe_cache_path(path, cache_dir) for path in paths]
+    recipes = [
+        _cached_load_recipe_file(path, cache_dir, cache_path)
+        for path, cache_path in zip(paths, cache_paths)
+    ]
+    _prune_cache_entries(cache_dir, "*.pkl", keep={cache_path.name for cache_path in cache_paths})
     return recipes
 
 
+def _recipe_dir_digest(directory: Path) -> str:
+    digest = hashlib.blake2b(_source_fingerprint().encode("utf-8"), digest_size=16)
+    for path in sorted(directory.glob("*.json")):
+        stat = path.stat()
+        digest.update(f"\0{path.name}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+    return digest.hexdigest()
+
+
 class RecipeLibrary:
-    def __init__(self, recipes: Iterable[Recipe]):
+    def __init__(self, recipes: Iterable[Recipe], index: Optional[HowToIndex] = None):
         self.recipes: List[Recipe] = list(recipes)
-        self.index = HowToIndex([recipe.as_entry() for recipe in self.recipes])
-        self.index.build()
+        self._name_to_recipe: Dict[str, Recipe] = {recipe.name: recipe for recipe in self.recipes}
+        if index is None:
+            index = HowToIndex([recipe.as_entry() for recipe in self.recipes])
+            index.build()
+        self.index = index
 
     @classmethod
-    def from_directory(cls, directory: Path) -> "RecipeLibrary":
-        recipes = load_recipes_from_dir(directory)
-        return cls(recipes)
+    def from_directory(cls, directory: Path, cache_dir: Optional[Path] = None) -> "RecipeLibrary":
+        if cache_dir is None:
+            return cls(load_recipes_from_dir(directory))
+
+        if not directory.exists():
+            raise FileNotFoundError(f"Recipe directory does not exist: {directory}")
+
+        artifact = cache_dir / f"library-{_recipe_dir_digest(directory)}"
+        if artifact.is_dir():
+            try:
+                return cls.from_cache(artifact)
+            except Exception:  # A damaged artifact is rebuilt below.
+                shutil.rmtree(artifact, ignore_errors=True)
+
+        library = cls(load_recipes_from_dir(directory, cache_dir=cache_dir))
+        staging = cache_dir / f"{artifact.name}.{os.getpid()}.tmp"
+        try:
+            library.to_cache(staging)
+            os.replace(staging, artifact)
+        except OSError:  # Unwritable cache, or another process published the artifact first.
+            shutil.rmtree(staging, ignore_errors=True)
+        else:
+            _prune_cache_entries(cache_dir, "library-*", keep={artifact.name})
+        return library
+
+    def to_cache(self, path: Path) -> None:
+        """Persist the parsed recipes and the built index under ``path``."""
+
+        path.mkdir(parents=True, exist_ok=True)
+        with (path / "recipes.pkl").open("wb") as handle:
+            pickle.dump(self.recipes, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        self.index.save(path / "index")
+
+    @classmethod
+    def from_cache(cls, path: Path) -> "RecipeLibrary":
+        with (path / "recipes.pkl").open("rb") as handle:
+            recipes: List[Recipe] = pickle.load(handle)
+        for recipe in recipes:
+            recipe.name = sys.intern(recipe.name)
+        index = HowToIndex.load(path / "index", [recipe.as_entry() for recipe in recipes])
+        return cls(recipes, index=index)
 
     def add_recipe(self, recipe: Recipe) -> None:
         self.recipes.append(recipe)
-        self.index.add_entry(recipe.as_entry())
-        self.index.build()
+        self._name_to_recipe[recipe.name] = recipe
+        self.index.append(recipe.as_entry())
 
     def search(self, query: str, top_k: int = 3) -> List[SearchResult]:
         return self.index.search(query, top_k=top_k)
 
+    def search_batch(self, queries: Sequence[str], top_k: int = 3) -> List[List[SearchResult]]:
+        return self.index.search_batch(queries, top_k=top_k)
+
+    def get_recipe(self, name: str) -> Optional[Recipe]:
+        return self._name_to_recipe.get(name)
+
     def top_recipes(self, query: str, top_k: int = 3) -> List[Recipe]:
         results = self.search(query, top_k=top_k)
-        matched_names = {result.entry.key for result in results}
-        name_to_recipe = {recipe.name: recipe for recipe in self.recipes}
         ordered: List[Recipe] = []
         for result in results:
-            recipe = name_to_recipe.get(result.entry.key)
+            recipe = self._name_to_recipe.get(result.entry.key)
             if recipe:
                 ordered.append(recipe)
         return ordered
\ No newline at end of file
@@ -9,8 +9,11 @@ from .schema import (
     PLAN_SCHEMA_VERSION,
     allowed_tool_names,
     example_plan,
+    get_plan_validator,
+    is_allowed_tool,
     plan_schema_json,
     validate_plan,
+    validate_plan_fast,
 )
 from .tools import TOOLS
 
@@ -22,9 +25,12 @@ __all__ = [
     "allowed_tool_names",
     "build_planner_prompt_with_knowledge",
     "example_plan",
+    "get_plan_validator",
+    "is_allowed_tool",
     "plan_schema_json",
     "planner_system_prompt",
     "render_planner_prompt",
     "retrieve_planning_knowledge",
     "validate_plan",
+    "validate_plan_fast",
 ]
\ No newline at end of file
@@ -1,13 +1,48 @@
 from __future__ import annotations
 
 import json
+import math
+from functools import lru_cache
 from textwrap import dedent
 from typing import Any, Dict, List, Optional
 
 from .schema import allowed_tool_names, plan_schema_json
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; fall back to the stdlib encoder.
+    orjson = None
+
+_RESPONSE_INSTRUCTION = (
+    "\nRespond with a JSON object that matches the schema and only uses allowed tools."
+)
+
+def _has_non_finite(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(k) or _has_non_finite(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
+def _dump_snapshot(snapshot: Dict[str, Any]) -> str:
+    if orjson is not None:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        try:
+            dumped = orjson.dumps(snapshot, option=options)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            # orjson silently writes NaN/Infinity as null, so only output containing a null can
+            # have lost one; those snapshots are scanned and, if needed, use the stdlib encoder.
+            if b"null" not in dumped or not _has_non_finite(snapshot):
+                return dumped.decode("utf-8")
+    return json.dumps(snapshot, indent=2, sort_keys=True)
+
+@lru_cache(maxsize=1)
 def planner_system_prompt() -> str:
-    """Fixed system instructions for the planner model."""
+    """Fixed system instructions for the planner model (built once per process)."""
 
     tool_names = ", ".join(allowed_tool_names())
 
@@ -55,20 +90,16 @@ def render_planner_prompt(
 ) -> str:
     """Create the full prompt the LLM sees when planning."""
 
-    parts = [planner_system_prompt(), "\n---\n", f"Goal: {goal}"]
+    parts = [planner_system_prompt(), "\n---\nGoal: ", goal]
 
     if context:
-        parts.append(f"\nMission context: {context}")
+        parts += ("\nMission context: ", context)
 
     if retrieved_facts:
-        facts = "\n".join(f"- {fact}" for fact in retrieved_facts)
-        parts.append(f"\nHelpful knowledge:\n{facts}")
+        parts.append("\nHelpful knowledge:")
+        for fact in retrieved_facts:
+            parts += ("\n- ", fact)
 
-    snapshot_json = json.dumps(snapshot, indent=2, sort_keys=True)
-    parts.append(f"\nCurrent snapshot (read-only):\n{snapshot_json}")
-
-    parts.append(
-        "\nRespond with a JSON object that matches the schema and only uses allowed tools."
-    )
+    parts += ("\nCurrent snapshot (read-only):\n", _dump_snapshot(snapshot), _RESPONSE_INSTRUCTION)
 
     return "".join(parts)
\ No newline at end of file
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from itertools import islice
 from typing import Any, Dict, List, Optional
 
 from ..knowledge import Recipe, RecipeLibrary, SearchResult
@@ -22,12 +23,8 @@ class PlannerKnowledgeContext:
 def _format_recipe_fact(recipe: Recipe, max_steps: int) -> str:
     step_chunks: List[str] = []
     for step in recipe.steps[:max_steps]:
-        detail = step.details
-        if len(detail) > 180:
-            detail = f"{detail[:177]}..."
-
-        checks = f" Checks: {', '.join(step.checks[:2])}" if step.checks else ""
-        step_chunks.append(f"{step.title} – {step.action}: {detail}{checks}")
+        checks = f" Checks: {step.checks_preview}" if step.checks else ""
+        step_chunks.append(f"{step.title} – {step.action}: {step.details_truncated}{checks}")
 
     steps_text = " | ".join(step_chunks) if step_chunks else "No steps provided"
     tags = f" Tags: {', '.join(recipe.tags)}." if recipe.tags else ""
@@ -36,7 +33,7 @@ def _format_recipe_fact(recipe: Recipe, max_steps: int) -> str:
 
 def _snapshot_hints(snapshot: Dict[str, Any], max_fields: int = 6) -> str:
     hints: List[str] = []
-    for key, value in list(snapshot.items())[:max_fields]:
+    for key, value in islice(snapshot.items(), max_fields):
         if isinstance(value, (str, int, float)):
             hints.append(f"{key}: {value}")
         elif isinstance(value, list):
@@ -44,7 +41,7 @@ def _snapshot_hints(snapshot: Dict[str, Any], max_fields: int = 6) -> str:
             if preview:
                 hints.append(f"{key}: {preview}")
         elif isinstance(value, dict):
-            nested = ", ".join(f"{k}={v}" for k, v in list(value.items())[:3])
+            nested = ", ".join(f"{k}={v}" for k, v in islice(value.items(), 3))
             if nested:
                 hints.append(f"{key}: {nested}")
     return "; ".join(hints)
@@ -69,11 +66,10 @@ def retrieve_planning_knowledge(
     search_query = query or "\n".join(part for part in [goal, context, snapshot_hint] if part)
 
     results = library.search(search_query, top_k=top_k)
-    name_to_recipe = {recipe.name: recipe for recipe in library.recipes}
 
     facts: List[str] = []
     for result in results:
-        recipe = name_to_recipe.get(result.entry.key)
+        recipe = library.get_recipe(result.entry.key)
         if not recipe:
             active_logger.debug("[planner.rag] Missing recipe for key '%s'", result.entry.key)
             continue
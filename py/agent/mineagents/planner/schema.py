@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
 
 from jsonschema import Draft7Validator
 
+try:
+    import fastjsonschema
+except ImportError:  # fastjsonschema is an optional speedup; Draft7Validator covers the fallback.
+    fastjsonschema = None
+
 from .tools import TOOLS
 
 PLAN_SCHEMA_VERSION = "1.0.0"
 
+_ALLOWED_TOOL_NAMES: Tuple[str, ...] = tuple(tool.name for tool in TOOLS)
+_ALLOWED_TOOL_SET: FrozenSet[str] = frozenset(_ALLOWED_TOOL_NAMES)
+
+@lru_cache(maxsize=1)
 def build_plan_schema() -> Dict[str, Any]:
     step_schemas = [tool.as_step_schema() for tool in TOOLS]
+    step_items = {"oneOf": step_schemas}
     team_step_schema = {
         "type": "object",
         "required": ["id", "task", "role"],
@@ -66,7 +77,7 @@ def build_plan_schema() -> Dict[str, Any]:
             "steps": {
                 "type": "array",
                 "minItems": 1,
-                "items": {"oneOf": step_schemas}
+                "items": step_items
             }
         }
     }
@@ -94,7 +105,7 @@ def build_plan_schema() -> Dict[str, Any]:
             "steps": {
                 "type": "array",
                 "minItems": 1,
-                "items": {"oneOf": step_schemas}
+                "items": step_items
             },
             "stop_condition": {
                 "type": "string",
@@ -119,17 +130,51 @@ def build_plan_schema() -> Dict[str, Any]:
 
 PLAN_SCHEMA: Dict[str, Any] = build_plan_schema()
 
+Draft7Validator.check_schema(PLAN_SCHEMA)
+_PLAN_VALIDATOR = Draft7Validator(PLAN_SCHEMA)
+
+_PLAN_SCHEMA_JSON_INDENT2 = json.dumps(PLAN_SCHEMA, indent=2, sort_keys=True)
+
 def plan_schema_json(indent: int = 2) -> str:
+    if indent == 2:
+        return _PLAN_SCHEMA_JSON_INDENT2
     return json.dumps(PLAN_SCHEMA, indent=indent, sort_keys=True)
 
+def get_plan_validator() -> Draft7Validator:
+    """Shared validator for PLAN_SCHEMA; the schema itself is checked once at import."""
+
+    return _PLAN_VALIDATOR
+
 def validate_plan(plan: Dict[str, Any]) -> None:
     """Validate a plan object against the JSON Schema and allowed tools."""
 
-    Draft7Validator.check_schema(PLAN_SCHEMA)
-    Draft7Validator(PLAN_SCHEMA).validate(plan)
+    _PLAN_VALIDATOR.validate(plan)
+
+@lru_cache(maxsize=1)
+def _compiled_plan_check() -> Optional[Callable[[Any], Any]]:
+    # Compiling generates and execs Python source (~100 ms), so defer it to first use.
+    if fastjsonschema is None:
+        return None
+    return fastjsonschema.compile(PLAN_SCHEMA)
+
+def validate_plan_fast(plan: Dict[str, Any]) -> None:
+    """Like validate_plan, but only builds detailed errors for plans that fail a boolean check."""
+
+    plan_check = _compiled_plan_check()
+    if plan_check is None:
+        if not _PLAN_VALIDATOR.is_valid(plan):
+            _PLAN_VALIDATOR.validate(plan)
+        return
+    try:
+        plan_check(plan)
+    except fastjsonschema.JsonSchemaException:
+        _PLAN_VALIDATOR.validate(plan)
+
+def allowed_tool_names() -> Tuple[str, ...]:
+    return _ALLOWED_TOOL_NAMES
 
-def allowed_tool_names() -> List[str]:
-    return [tool.name for tool in TOOLS]
+def is_allowed_tool(name: str) -> bool:
+    return name in _ALLOWED_TOOL_SET
 
 def example_plan(goal: str = "gather oak wood") -> Dict[str, Any]:
     """Return a minimal, schema-valid example plan."""
@@ -14,40 +14,45 @@ PositionSchema: Dict[str, Any] = {
     "additionalProperties": False
 }
 
-@dataclass
+@dataclass(slots=True)
 class ToolSpec:
     name: str
     description: str
     args_schema: Dict[str, Any] = field(default_factory=dict)
+    _step_schema: Dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
 
     def as_step_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "required": ["action", "args", "reason"],
-            "additionalProperties": False,
-            "properties": {
-                "id": {
-                    "type": "string",
-                    "description": "Unique identifier per step, e.g., step-1"
-                },
-                "action": {"const": self.name},
-                "args": self.args_schema,
-                "reason": {
-                    "type": "string",
-                    "minLength": 1,
-                    "description": "Why this action is needed"
-                },
-                "after": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Optional step ids that must finish before this runs"
-                },
-                "expected_outcome": {
-                    "type": "string",
-                    "description": "What success looks like for this step"
+        """Step schema for this tool, built once and shared by every plan schema."""
+
+        if self._step_schema is None:
+            self._step_schema = {
+                "type": "object",
+                "required": ["action", "args", "reason"],
+                "additionalProperties": False,
+                "properties": {
+                    "id": {
+                        "type": "string",
+                        "description": "Unique identifier per step, e.g., step-1"
+                    },
+                    "action": {"const": self.name},
+                    "args": self.args_schema,
+                    "reason": {
+                        "type": "string",
+                        "minLength": 1,
+                        "description": "Why this action is needed"
+                    },
+                    "after": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional step ids that must finish before this runs"
+                    },
+                    "expected_outcome": {
+                        "type": "string",
+                        "description": "What success looks like for this step"
+                    }
                 }
             }
-        }
+        return self._step_schema
 
 def make_tools() -> list[ToolSpec]:
     """List of allowed planner tools with their argument schemas."""
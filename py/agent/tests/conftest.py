@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mineagents.knowledge import RecipeLibrary  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def recipe_library(pytestconfig: pytest.Config) -> RecipeLibrary:
+    cache = getattr(pytestconfig, "cache", None)  # absent under -p no:cacheprovider
+    cache_dir = cache.mkdir("recipes") if cache is not None else None
+    return RecipeLibrary.from_directory(ROOT / "recipes", cache_dir=cache_dir)
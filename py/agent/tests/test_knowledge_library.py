@@ -1,21 +1,33 @@
 from __future__ import annotations
 
+import json
+import os
 import sys
 from pathlib import Path
 
 import pytest
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
+from mineagents.knowledge import (
+    HowToIndex,
+    KnowledgeEntry,
+    RecipeLibrary,
+    RecipeValidationError,
+    load_recipe_file,
+    load_recipes_from_dir,
+)
+from mineagents.knowledge import index as index_module
+from mineagents.knowledge import recipes as recipes_module
 
-from mineagents.knowledge import RecipeLibrary, RecipeValidationError, load_recipe_file
 
+def _write_recipe(directory: Path, stem: str, name: str, details: str = "Craft oak planks") -> Path:
+    path = directory / f"{stem}.json"
+    step = {"title": "Craft", "action": "craft", "details": details}
+    path.write_text(json.dumps({"name": name, "goal": stem, "steps": [step]}))
+    return path
 
-def test_recipes_load_from_repo_data() -> None:
-    data_dir = ROOT / "recipes"
-    library = RecipeLibrary.from_directory(data_dir)
 
-    names = {recipe.name for recipe in library.recipes}
+def test_recipes_load_from_repo_data(recipe_library: RecipeLibrary) -> None:
+    names = {recipe.name for recipe in recipe_library.recipes}
     assert "Build a wooden shelter" in names
     assert "Iron tools pipeline" in names
     assert len(names) >= 2
@@ -31,14 +43,182 @@ def test_invalid_recipe_has_actionable_error(tmp_path: Path) -> None:
     assert "missing required field 'recipe.name'" in str(exc.value)
 
 
-def test_sample_query_returns_expected_top_hits() -> None:
-    data_dir = ROOT / "recipes"
-    library = RecipeLibrary.from_directory(data_dir)
+@pytest.mark.parametrize(
+    ("query", "top_k", "expected_key"),
+    [
+        ("build a wooden shelter before nightfall", 1, "Build a wooden shelter"),
+        ("iron tools pipeline", 3, "Iron tools pipeline"),
+    ],
+)
+def test_sample_query_returns_expected_top_hits(
+    recipe_library: RecipeLibrary, query: str, top_k: int, expected_key: str
+) -> None:
+    results = recipe_library.search(query, top_k=top_k)
+    assert expected_key in [r.entry.key for r in results]
 
-    shelter_results = library.search("build a wooden shelter before nightfall", top_k=2)
-    assert shelter_results
-    assert shelter_results[0].entry.key == "Build a wooden shelter"
 
-    iron_results = library.search("iron tools pipeline", top_k=3)
-    assert iron_results
-    assert any(r.entry.key == "Iron tools pipeline" for r in iron_results)
\ No newline at end of file
+def test_appended_entries_match_full_rebuild() -> None:
+    texts = [
+        "chop oak logs and craft planks",
+        "mine iron ore with a stone pickaxe",
+        "smelt iron ore into ingots in a furnace",
+        "build a wooden shelter from oak planks",
+    ]
+    entries = [
+        KnowledgeEntry(key=str(idx), text=text, source="test") for idx, text in enumerate(texts)
+    ]
+
+    incremental = HowToIndex(entries[:2])
+    incremental.build()
+    incremental.search("iron ingots furnace")  # cached query vectors must not survive append
+    incremental.append(entries[2])
+    incremental.search("smelt")  # merges the pending row before the next append is buffered
+    incremental.append(entries[3])
+
+    rebuilt = HowToIndex(entries)
+    rebuilt.build()
+
+    for query in ["iron ingots furnace", "oak planks shelter", "pickaxe"]:
+        expected = rebuilt.search(query, top_k=4)
+        actual = incremental.search(query, top_k=4)
+        assert [r.entry.key for r in actual] == [r.entry.key for r in expected]
+        assert [r.score for r in actual] == pytest.approx([r.score for r in expected])
+
+
+def test_ties_at_the_cutoff_keep_insertion_order() -> None:
+    entries = [
+        KnowledgeEntry(key=f"filler-{idx}", text="cobblestone", source="test") for idx in range(40)
+    ]
+    entries[25] = KnowledgeEntry(key="match", text="diamond pickaxe", source="test")
+    index = HowToIndex(entries)
+
+    results = index.search("diamond", top_k=4)
+
+    assert [r.entry.key for r in results] == ["match", "filler-0", "filler-1", "filler-2"]
+
+
+def test_search_batch_matches_individual_searches() -> None:
+    index = HowToIndex(
+        [
+            KnowledgeEntry(key="wood", text="chop oak logs and craft planks", source="test"),
+            KnowledgeEntry(key="iron", text="smelt iron ore into ingots", source="test"),
+            KnowledgeEntry(key="shelter", text="build a shelter from oak planks", source="test"),
+        ]
+    )
+    queries = ["oak planks", "", "iron ingots furnace", "unknown words only"]
+
+    batched = index.search_batch(queries, top_k=2)
+
+    assert len(batched) == len(queries)
+    for query, results in zip(queries, batched):
+        expected = index.search(query, top_k=2)
+        assert [r.entry.key for r in results] == [r.entry.key for r in expected]
+        assert [r.score for r in results] == pytest.approx([r.score for r in expected])
+
+
+def test_recipe_cache_reuses_unchanged_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    recipes_dir = tmp_path / "recipes"
+    recipes_dir.mkdir()
+    recipe_file = _write_recipe(recipes_dir, "planks", "Make planks")
+    cache_dir = tmp_path / "cache"
+
+    first = load_recipes_from_dir(recipes_dir, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    def fail_to_parse(path: Path) -> None:
+        raise AssertionError(f"{path} was parsed again despite an unchanged cache entry")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(recipes_module, "load_recipe_file", fail_to_parse)
+        assert load_recipes_from_dir(recipes_dir, cache_dir=cache_dir) == first
+
+    # Same size, different mtime: only the modification time can invalidate the entry.
+    size = recipe_file.stat().st_size
+    _write_recipe(recipes_dir, "planks", "Make PLANKS")
+    os.utime(recipe_file, ns=(0, 0))
+    assert recipe_file.stat().st_size == size
+
+    reloaded = load_recipes_from_dir(recipes_dir, cache_dir=cache_dir)
+    assert [recipe.name for recipe in reloaded] == ["Make PLANKS"]
+    assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+
+def test_unwritable_recipe_cache_is_ignored(tmp_path: Path) -> None:
+    recipes_dir = tmp_path / "recipes"
+    recipes_dir.mkdir()
+    _write_recipe(recipes_dir, "planks", "Make planks")
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+
+    library = RecipeLibrary.from_directory(recipes_dir, cache_dir=blocker / "cache")
+
+    assert [recipe.name for recipe in library.recipes] == ["Make planks"]
+
+
+def test_library_artifact_round_trips(tmp_path: Path) -> None:
+    recipes_dir = tmp_path / "recipes"
+    recipes_dir.mkdir()
+    _write_recipe(recipes_dir, "planks", "Make planks")
+    _write_recipe(recipes_dir, "ingots", "Make ingots", "Smelt iron ore")
+    cache_dir = tmp_path / "cache"
+
+    built = RecipeLibrary.from_directory(recipes_dir, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("library-*"))) == 1
+
+    cached = RecipeLibrary.from_directory(recipes_dir, cache_dir=cache_dir)
+    for recipe in cached.recipes:
+        assert recipe.as_entry().key is sys.intern(recipe.name)
+    extra_file = _write_recipe(tmp_path, "torches", "Make torches", "Craft torches from coal")
+    # The cached index is memory-mapped read-only; appending must not write into it.
+    for library in (built, cached):
+        library.add_recipe(load_recipe_file(extra_file))
+
+    for query in ("craft oak planks", "smelt iron", "coal torches", "unknown words"):
+        expected = [(hit.entry.key, hit.score) for hit in built.search(query, top_k=2)]
+        assert [(hit.entry.key, hit.score) for hit in cached.search(query, top_k=2)] == expected
+    assert cached.get_recipe("Make planks") is not None
+
+
+def test_code_changes_invalidate_cached_recipes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    recipes_dir = tmp_path / "recipes"
+    recipes_dir.mkdir()
+    _write_recipe(recipes_dir, "planks", "Make planks")
+    cache_dir = tmp_path / "cache"
+    RecipeLibrary.from_directory(recipes_dir, cache_dir=cache_dir)
+    old_artifacts = {path.name for path in cache_dir.glob("library-*")}
+    old_pickles = {path.name for path in cache_dir.glob("*.pkl")}
+
+    monkeypatch.setattr(recipes_module, "_source_fingerprint", lambda: "edited source")
+    RecipeLibrary.from_directory(recipes_dir, cache_dir=cache_dir)
+
+    # A fresh artifact replaces the stale one instead of accumulating beside it.
+    new_artifacts = {path.name for path in cache_dir.glob("library-*")}
+    assert len(new_artifacts) == 1
+    assert not new_artifacts & old_artifacts
+    new_pickles = {path.name for path in cache_dir.glob("*.pkl")}
+    assert len(new_pickles) == 1
+    assert not new_pickles & old_pickles
+
+
+def test_posting_list_scoring_matches_full_scoring(monkeypatch: pytest.MonkeyPatch) -> None:
+    entries = [
+        KnowledgeEntry(key="wood", text="chop oak logs and craft planks", source="test"),
+        KnowledgeEntry(key="iron", text="smelt iron ore into ingots", source="test"),
+        KnowledgeEntry(key="shelter", text="build a shelter from oak planks", source="test"),
+    ]
+    full = HowToIndex(entries)
+    full.build()
+
+    monkeypatch.setattr(index_module, "POSTINGS_MIN_NNZ", 0)
+    postings = HowToIndex(entries)
+    postings.build()
+
+    for query in ["oak planks", "iron ingots", "unknown words"]:
+        expected = full.search(query, top_k=3)
+        actual = postings.search(query, top_k=3)
+        assert [r.entry.key for r in actual] == [r.entry.key for r in expected]
+        assert [r.score for r in actual] == pytest.approx([r.score for r in expected])
\ No newline at end of file
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
 import pytest
 from jsonschema import Draft7Validator, ValidationError
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
-
-from mineagents.planner.schema import PLAN_SCHEMA, example_plan, validate_plan
+from mineagents.planner.schema import (
+    PLAN_SCHEMA,
+    allowed_tool_names,
+    example_plan,
+    get_plan_validator,
+    is_allowed_tool,
+    validate_plan,
+    validate_plan_fast,
+)
 from mineagents.planner.tools import TOOLS
 
 def test_schema_is_self_validating() -> None:
@@ -26,7 +28,24 @@ def test_invalid_action_fails_validation() -> None:
     with pytest.raises(ValidationError):
         validate_plan(plan)
 
+def test_fast_validation_matches_strict_validation() -> None:
+    validate_plan_fast(example_plan())
+
+    plan = example_plan()
+    plan["steps"][0]["action"] = "fly"
+
+    with pytest.raises(ValidationError):
+        validate_plan_fast(plan)
+
+def test_plan_validator_is_shared() -> None:
+    validator = get_plan_validator()
+    assert validator is get_plan_validator()
+    assert validator.is_valid(example_plan())
+
 def test_allowed_tools_are_listed() -> None:
     names = [tool.name for tool in TOOLS]
     assert "move" in names
-    assert len(names) == len(set(names))
\ No newline at end of file
+    assert len(names) == len(set(names))
+    assert allowed_tool_names() == tuple(names)
+    assert is_allowed_tool("move")
+    assert not is_allowed_tool("fly")
\ No newline at end of file
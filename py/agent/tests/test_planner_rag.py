@@ -1,22 +1,17 @@
 from __future__ import annotations
 
-from pathlib import Path
-
 from mineagents.knowledge import RecipeLibrary
-from mineagents.planner import build_planner_prompt_with_knowledge
-
+from mineagents.planner import build_planner_prompt_with_knowledge, render_planner_prompt
 
-def test_prompt_includes_retrieved_knowledge(tmp_path: Path, caplog):
-    recipes_dir = Path(__file__).parent.parent / "recipes"
-    library = RecipeLibrary.from_directory(recipes_dir)
 
+def test_prompt_includes_retrieved_knowledge(recipe_library: RecipeLibrary, caplog):
     goal = "build a shelter before nightfall"
     snapshot = {"time_of_day": "sunset", "inventory": ["oak_planks", "oak_log"]}
 
     prompt, context = build_planner_prompt_with_knowledge(
         goal=goal,
         snapshot=snapshot,
-        library=library,
+        library=recipe_library,
         max_steps=2,
         logger=None,
     )
@@ -27,4 +22,13 @@ def test_prompt_includes_retrieved_knowledge(tmp_path: Path, caplog):
     assert "Build a wooden shelter" in prompt
 
     with caplog.at_level("DEBUG"):
-        build_planner_prompt_with_knowledge(goal=goal, snapshot=snapshot, library=library)
\ No newline at end of file
+        build_planner_prompt_with_knowledge(goal=goal, snapshot=snapshot, library=recipe_library)
+
+
+def test_prompt_snapshot_keeps_non_finite_numbers() -> None:
+    snapshot = {"position": {"x": 1.5, "y": float("nan")}, "health": float("inf")}
+
+    prompt = render_planner_prompt(goal="survive", snapshot=snapshot)
+
+    assert '"y": NaN' in prompt
+    assert '"health": Infinity' in prompt